@@ -1,53 +1,243 @@
 import os
 import joblib
-import pandas as pd
+import numpy as np
 import hashlib
 import json
+import orjson
+import time
+import functools
+import warnings
+import threading
+import atexit
+from collections import deque
 from flask import Flask, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from pymongo import MongoClient, DESCENDING
+from pymongo.errors import BulkWriteError, OperationFailure
+from bson import ObjectId
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 
+# Optional compiled inference runtime (falls back to the sklearn pickle)
+try:
+    import onnxruntime as ort
+
+    HAS_ONNX = True
+except ImportError:
+    HAS_ONNX = False
+
+# Optional BLAKE3 for the audit hash (hashlib SHA-256 otherwise)
+try:
+    from blake3 import blake3 as audit_hash
+
+    HASH_ALGORITHM = "BLAKE3"
+except ImportError:
+    audit_hash = hashlib.sha256
+    HASH_ALGORITHM = "SHA-256"
+
+# Optional Numba JIT for the clinical rule kernels (plain Python otherwise)
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# Older model.pkl files were fitted on a named DataFrame; rows are served as raw arrays in FEATURE_NAMES order
+warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+
+class OrjsonProvider(JSONProvider):
+    """Routes jsonify/request JSON through orjson; datetimes and NumPy values serialize natively."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=ORJSON_OPTIONS), mimetype="application/json")
+
+class EzyMediFlask(Flask):
+    json_provider_class = OrjsonProvider
+
 # Initialize environment and Flask
 load_dotenv()
-app = Flask(__name__)
+app = EzyMediFlask(__name__)
 CORS(app)
 
 # System Configuration
 DB_NAME = "ezymedi_v4_production"
+# Opt-in TTL expiry for vitals; unset keeps every reading indefinitely
+VITALS_RETENTION_DAYS = os.environ.get("VITALS_RETENTION_DAYS")
 model = None
+onnx_session = None
+mongo_client = None
 vitals_col = None
 
+# ABP progress only needs an approximate record count, so it is cached briefly
+ABP_COUNT_TTL = 5.0
+abp_counts = {}  # patient_id -> (count, expires_at)
+
+# Ingested vitals are buffered and written in batches by a background thread
+INSERT_FLUSH_INTERVAL = 0.2
+INSERT_BATCH_SIZE = 50
+MAX_PENDING_VITALS = 5000  # cap on buffered vitals while MongoDB is unreachable
+MAX_FLUSH_BACKOFF = 5.0
+pending_vitals = deque()
+pending_lock = threading.Lock()
+flush_event = threading.Event()
+
+# add_vital is the only writer, so each patient's newest vitals are kept in memory.
+# GET serves the latest record from here, and forecasting reads a full window
+# without touching the (possibly not yet flushed) collection.
+# Under a multi-process server each worker sees only part of the stream, so the
+# window is opt-in (EZYMEDI_LOCAL_WINDOW=1, single-process deployments only) and is
+# switched on automatically for the single-process development server below.
+RECENT_WINDOW = 10
+LOCAL_WINDOW_ENABLED = os.environ.get("EZYMEDI_LOCAL_WINDOW") == "1"
+recent_vitals = {}  # patient_id -> deque of newest vitals, oldest first
+recent_lock = threading.Lock()
+
 # Medical Features for AI Analysis
 FEATURE_NAMES = [
     'body_temperature_C', 'humidity_percent', 'spo2_percent', 'ecg_bpm',
     'bp_systolic_mmHg', 'bp_diastolic_mmHg', 'alcohol_mg_L', 'motion_magnitude'
 ]
+FEATURE_SLOTS = tuple(enumerate(FEATURE_NAMES))
+
+# Per-thread (1, 8) inference row, allocated once and refilled on every request
+inference_buffers = threading.local()
 
 def connect_db():
     """Initializes connection to MongoDB Atlas with production timeouts."""
-    global vitals_col
+    global mongo_client, vitals_col
     try:
         conn = os.getenv("MONGO_CONNECTION_STRING")
         if not conn:
             print("❌ .env Error: MONGO_CONNECTION_STRING not found.")
             return
         
-        # serverSelectionTimeoutMS prevents the build from hanging if the DB is unreachable
-        client = MongoClient(conn, tlsAllowInvalidCertificates=True, serverSelectionTimeoutMS=5000)
-        db = client[DB_NAME]
+        # serverSelectionTimeoutMS prevents the build from hanging if the DB is unreachable.
+        # One shared client per process; the pool is sized for concurrent dashboard polling
+        # and keeps warm sockets so requests skip the TLS handshake.
+        mongo_client = MongoClient(
+            conn,
+            tlsAllowInvalidCertificates=True,
+            serverSelectionTimeoutMS=5000,
+            maxPoolSize=50,
+            minPoolSize=5,
+            retryWrites=True,
+            # Return stored timestamps as aware UTC, matching records served from memory
+            tz_aware=True,
+            compressors='zstd,zlib'
+        )
+        db = mongo_client[DB_NAME]
         vitals_col = db['vitals']
+
+        # Compound index backs the per-patient "latest" lookup and record count
+        vitals_col.create_index([('patient_id', 1), ('timestamp', -1)])
         
         # Verify connection immediately
-        client.admin.command('ping')
+        mongo_client.admin.command('ping')
         print(f"📡 SUCCESS: Connected to MongoDB Atlas")
     except Exception as e:
         print(f"❌ DATABASE CONNECTION ERROR: {e}")
+        return
+
+    apply_retention_policy(db)
+
+def apply_retention_policy(db):
+    """Creates, updates or removes the vitals TTL index to match VITALS_RETENTION_DAYS."""
+    try:
+        existing = vitals_col.index_information().get('timestamp_1')
+        current = existing.get('expireAfterSeconds') if existing else None
+
+        if VITALS_RETENTION_DAYS is None:
+            # No retention configured: make sure nothing is being expired
+            if current is not None:
+                try:
+                    vitals_col.drop_index('timestamp_1')
+                    print("🗄️ Vitals retention disabled: TTL index removed.")
+                except OperationFailure as e:
+                    # Another worker starting concurrently already dropped it (IndexNotFound)
+                    if e.code != 27: raise
+            return
+
+        seconds = int(VITALS_RETENTION_DAYS) * 86400
+        if seconds <= 0:
+            raise ValueError(f"VITALS_RETENTION_DAYS must be positive, got {VITALS_RETENTION_DAYS}")
+
+        if existing is None:
+            # TTL index expires old readings so the live stream and its indexes stay bounded
+            vitals_col.create_index('timestamp', expireAfterSeconds=seconds)
+        elif current != seconds:
+            # create_index cannot change TTL options on an existing index; collMod can
+            db.command('collMod', vitals_col.name,
+                       index={'keyPattern': {'timestamp': 1}, 'expireAfterSeconds': seconds})
+        print(f"🗄️ Vitals retention: {VITALS_RETENTION_DAYS} days.")
+    except Exception as e:
+        print(f"❌ RETENTION POLICY ERROR: {e}")
+
+def flush_vitals():
+    """Writes all buffered vitals to MongoDB in a single unordered batch.
+
+    Returns False when the batch could not be written and was re-queued.
+    """
+    with pending_lock:
+        if not pending_vitals: return True
+        batch = list(pending_vitals)
+        pending_vitals.clear()
+    try:
+        # ordered=False keeps one bad document from blocking the rest of the batch
+        vitals_col.insert_many(batch, ordered=False)
+    except BulkWriteError as e:
+        # Per-document rejections; duplicate keys (11000) are records already stored
+        # by an earlier attempt that failed after a partial write
+        for err in e.details.get('writeErrors', []):
+            if err.get('code') == 11000: continue
+            print(f"❌ Vitals Write Error: {err.get('errmsg')} | document: {err.get('op')}")
+    except Exception as e:
+        # Transient failure (network, failover): put the batch back at the front
+        with pending_lock:
+            pending_vitals.extendleft(reversed(batch))
+            dropped = 0
+            while len(pending_vitals) > MAX_PENDING_VITALS:
+                pending_vitals.popleft()
+                dropped += 1
+        print(f"❌ Vitals Flush Error, {len(batch)} records re-queued: {e}")
+        if dropped:
+            print(f"⚠️ Vitals buffer full: dropped {dropped} oldest records.")
+        return False
+    return True
+
+def vitals_writer():
+    """Background loop flushing the buffer every interval, or early once a batch fills.
+
+    After a failed flush the loop backs off exponentially instead of retrying on every wake-up.
+    """
+    delay = INSERT_FLUSH_INTERVAL
+    while True:
+        if delay > INSERT_FLUSH_INTERVAL:
+            time.sleep(delay)
+        else:
+            flush_event.wait(delay)
+        flush_event.clear()
+        if flush_vitals():
+            delay = INSERT_FLUSH_INTERVAL
+        else:
+            delay = min(delay * 2, MAX_FLUSH_BACKOFF)
 
 # TRIGGER CONNECTION AT MODULE LEVEL
 connect_db()
 
+if vitals_col is not None:
+    threading.Thread(target=vitals_writer, daemon=True).start()
+    atexit.register(flush_vitals)
+
 # Load the Random Forest 'Brain'
 try:
     path = os.path.join(os.path.dirname(__file__), '../ml_model/model.pkl')
@@ -59,6 +249,43 @@ try:
 except Exception as e:
     print(f"❌ AI Load Error: {e}")
 
+# Prefer the ONNX export of the same forest for compiled tree traversal
+try:
+    onnx_path = os.path.join(os.path.dirname(__file__), '../ml_model/model.onnx')
+    if HAS_ONNX and os.path.exists(onnx_path):
+        # An export older than model.pkl belongs to a previous training run
+        if os.path.exists(path) and os.path.getmtime(onnx_path) < os.path.getmtime(path):
+            raise RuntimeError("model.onnx is older than model.pkl (stale export)")
+        onnx_session = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+        print("⚡ ONNX Runtime inference enabled.")
+except Exception as e:
+    print(f"⚠️ ONNX Load Error, using sklearn model: {e}")
+
+def bson_timestamp(ts):
+    """Truncates a UTC datetime to milliseconds, the precision it keeps after a BSON round trip."""
+    return ts.replace(microsecond=ts.microsecond // 1000 * 1000)
+
+def canonical_timestamp(ts):
+    """Single string form of a record timestamp for audit hashing, whatever its source."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return bson_timestamp(ts.astimezone(timezone.utc)).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+def build_feature_row(vitals):
+    """Fills this thread's reusable float32 feature row from a vitals document."""
+    row = getattr(inference_buffers, 'row', None)
+    if row is None:
+        row = inference_buffers.row = np.empty((1, len(FEATURE_NAMES)), dtype=np.float32)
+    for i, name in FEATURE_SLOTS:
+        row[0, i] = vitals.get(name, 0)
+    return row
+
+def predict_abnormal(input_row):
+    """Classifies a (1, 8) float32 feature row, via ONNX Runtime when available."""
+    if onnx_session is not None:
+        return int(onnx_session.run(None, {'x': input_row})[0][0])
+    return int(model.predict(input_row)[0])
+
 # --- API ROUTES ---
 
 @app.route('/')
@@ -68,43 +295,107 @@ def health_check():
         "status": "online",
         "service": "EzyMedi AI Node",
         "database": "connected" if vitals_col is not None else "offline",
-        "ai_model": "loaded" if model is not None else "missing",
+        "ai_model": "loaded" if model is not None or onnx_session is not None else "missing",
         "timestamp": datetime.now(timezone.utc).isoformat()
     }), 200
 
-def calculate_forecasting(pid):
+# Forecast codes returned by the rule kernels; FORECAST_LABELS maps them to display text
+FORECAST_OFFLINE = 0
+FORECAST_UNAVAILABLE = 1
+FORECAST_LEARNING = 2
+FORECAST_STABLE = 3
+FORECAST_ALERT = 4
+FORECAST_WARNING = 5
+FORECAST_CRITICAL = 6
+FORECAST_LABELS = (
+    "Database Offline",
+    "Stable",
+    "Learning Baseline Signature...",
+    "✅ STABLE: NORMAL PHYSIOLOGICAL TRENDS",
+    "⚠️ ALERT: HIGH HEART RATE VELOCITY",
+    "🟠 WARNING: PERSISTENT PHYSIOLOGICAL DECAY",
+    "🔴 CRITICAL: DEATH SPIRAL PATTERN DETECTED"
+)
+
+@njit(cache=True)
+def forecast_trend(spo2_hist, bpm_hist):
+    """Classifies SpO2/BPM trajectories (newest first) into a forecast code."""
+    if spo2_hist.shape[0] < 5:
+        return FORECAST_LEARNING
+
+    spo2_drop = spo2_hist[4] - spo2_hist[0]
+    bpm_rise = bpm_hist[0] - bpm_hist[4]
+
+    # Chronic Decay Detection: Persistent downward trends
+    # (newest first: each reading may exceed the one before it by at most 1%)
+    is_decaying = np.all(np.diff(spo2_hist) >= -1)
+
+    if spo2_drop >= 3 and bpm_rise >= 10:
+        return FORECAST_CRITICAL
+
+    if is_decaying and spo2_hist[0] < 94:
+        return FORECAST_WARNING
+
+    if bpm_rise >= 20:
+        return FORECAST_ALERT
+
+    return FORECAST_STABLE
+
+@njit(cache=True)
+def guardrail_verdict(hr, spo2, forecast_code):
+    """CLINICAL GUARDRAILS: 1 forces abnormal, 0 forces normal, -1 defers to the model."""
+    # Rule B: Emergency Sync (Fixes Patient 002/003 Disconnect)
+    # If forecasting sees a crisis or oxygen is low, the AI classification MUST be abnormal
+    if spo2 < 93 or forecast_code >= FORECAST_ALERT:
+        return 1
+
+    # Rule A: Healthy Vitals Override (Fixes Patient 001 False Positive)
+    if 60 <= hr <= 95 and spo2 >= 96:
+        return 0
+
+    return -1
+
+# Response skeletons copied per request; alert lists are shared immutable tuples
+# (orjson serializes them as JSON arrays)
+REPORT_TEMPLATE = {"status": None, "alerts": (), "forecast": None}
+RESPONSE_TEMPLATE = {"vitals": None, "anomaly_report": None, "abp_progress": None, "mode": "Clinical Validation Node"}
+ALERT_HYPOXIA = ("CRITICAL: HYPOXIA DETECTED",)
+ALERT_DEATH_SPIRAL = ("AI: DEATH SPIRAL PREDICTION",)
+ALERT_TACHYCARDIA = ("ALERT: SEVERE TACHYCARDIA",)
+ALERT_ANOMALY = ("AI: ANOMALY DETECTED",)
+
+def calculate_forecasting(pid, latest_id):
     """TEMPORAL CRISIS FORECASTING: Analyzes trajectories from clinical history."""
     try:
-        if vitals_col is None: return "Database Offline"
-
-        # Fetch the last 10 records for trend analysis
-        history = list(vitals_col.find({"patient_id": pid}, sort=[('timestamp', DESCENDING)]).limit(10))
-
-        if len(history) < 5:
-            return "Learning Baseline Signature..."
-
-        new = history[0]
-        old = history[4] 
-
-        spo2_drop = old.get('spo2_percent', 98) - new.get('spo2_percent', 98)
-        bpm_rise = new.get('ecg_bpm', 75) - old.get('ecg_bpm', 75)
-
-        # Chronic Decay Detection: Persistent downward trends
-        spo2_vals = [h.get('spo2_percent', 98) for h in history]
-        is_decaying = all(spo2_vals[i] <= spo2_vals[i+1] + 1 for i in range(len(spo2_vals)-1))
-
-        if spo2_drop >= 3 and bpm_rise >= 10:
-            return "🔴 CRITICAL: DEATH SPIRAL PATTERN DETECTED"
-
-        if is_decaying and spo2_vals[0] < 94:
-            return "🟠 WARNING: PERSISTENT PHYSIOLOGICAL DECAY"
-
-        if bpm_rise >= 20:
-            return "⚠️ ALERT: HIGH HEART RATE VELOCITY"
-
-        return "✅ STABLE: NORMAL PHYSIOLOGICAL TRENDS"
+        if vitals_col is None: return FORECAST_OFFLINE
+        return _forecast_cached(pid, latest_id)
     except:
-        return "Stable"
+        return FORECAST_UNAVAILABLE
+
+@functools.lru_cache(maxsize=512)
+def _forecast_cached(pid, latest_id):
+    """Forecast for a patient as of their latest record; repeated polls hit the cache."""
+    with recent_lock:
+        window = list(recent_vitals.get(pid, ()))
+
+    # The in-memory window holds this process's newest records (possibly not yet
+    # flushed); use it newest first
+    history = window[::-1]
+    if len(history) < RECENT_WINDOW:
+        # Top up with the last 10 stored records for trend analysis, skipping any
+        # already in the window. Only the trend fields are transferred.
+        seen = {v['_id'] for v in window}
+        stored = vitals_col.find(
+            {"patient_id": pid},
+            {"spo2_percent": 1, "ecg_bpm": 1},
+            sort=[('timestamp', DESCENDING)]
+        ).limit(RECENT_WINDOW)
+        history += [h for h in stored if h['_id'] not in seen][:RECENT_WINDOW - len(history)]
+
+    n = len(history)
+    spo2_hist = np.fromiter((h.get('spo2_percent', 98) for h in history), dtype=np.float32, count=n)
+    bpm_hist = np.fromiter((h.get('ecg_bpm', 75) for h in history), dtype=np.float32, count=n)
+    return int(forecast_trend(spo2_hist, bpm_hist))
 
 @app.route('/api/vitals', methods=['POST'])
 def add_vital():
@@ -113,14 +404,30 @@ def add_vital():
 
     try:
         data = request.get_json()
-        data['timestamp'] = datetime.now(timezone.utc)
+        data['_id'] = ObjectId()
+        # Stored as it will read back from MongoDB, so memory and DB copies are identical
+        data['timestamp'] = bson_timestamp(datetime.now(timezone.utc))
 
         # Ensure sensor defaults
         defaults = {"humidity_percent": 50, "alcohol_mg_L": 0.0, "motion_magnitude": 0.5}
         for key, val in defaults.items():
             if key not in data: data[key] = val
 
-        vitals_col.insert_one(data)
+        with pending_lock:
+            pending_vitals.append(data)
+            if len(pending_vitals) >= INSERT_BATCH_SIZE: flush_event.set()
+
+        if LOCAL_WINDOW_ENABLED:
+            with recent_lock:
+                window = recent_vitals.get(data.get('patient_id'))
+                if window is None:
+                    window = recent_vitals[data.get('patient_id')] = deque(maxlen=RECENT_WINDOW)
+                window.append(data)
+
+        # Keep the cached ABP count in step with new inserts
+        cached = abp_counts.get(data.get('patient_id'))
+        if cached is not None:
+            abp_counts[data['patient_id']] = (cached[0] + 1, cached[1])
         return jsonify({"status": "success"}), 201
     except Exception as e:
         return jsonify({"status": "error", "msg": str(e)}), 500
@@ -134,67 +441,75 @@ def get_latest():
         return jsonify({"error": "No database connection established"}), 503
 
     try:
-        latest = vitals_col.find_one({"patient_id": pid}, sort=[('timestamp', DESCENDING)])
-        if not latest: return jsonify({"error": "No data found for this patient"}), 404
-
-        count = vitals_col.count_documents({"patient_id": pid})
+        # Latest record from memory when this process has ingested one (copied,
+        # since the response mutates it)
+        with recent_lock:
+            window = recent_vitals.get(pid)
+            latest = dict(window[-1]) if window else None
+
+        # Otherwise a single seek on the (patient_id, timestamp) index
+        if latest is None:
+            latest = vitals_col.find_one({"patient_id": pid}, sort=[('timestamp', DESCENDING)])
+            if not latest: return jsonify({"error": "No data found for this patient"}), 404
+
+        # Index-only COUNT_SCAN, run only once the cached count has expired
+        now = time.monotonic()
+        cached = abp_counts.get(pid)
+        if cached is None or cached[1] <= now:
+            count = vitals_col.count_documents({"patient_id": pid})
+            abp_counts[pid] = (count, now + ABP_COUNT_TTL)
+        else:
+            count = cached[0]
         abp_progress = min(round((count / 1000) * 100, 1), 100.0)
 
         # 1. CRISIS FORECASTING
-        forecast_status = calculate_forecasting(pid)
-
-        # 2. AI PREDICTION
-        is_abnormal = 0
-        if model:
-            input_row = [float(latest.get(f, 0)) for f in FEATURE_NAMES]
-            input_df = pd.DataFrame([input_row], columns=FEATURE_NAMES)
-            is_abnormal = int(model.predict(input_df)[0])
+        forecast_code = calculate_forecasting(pid, latest['_id'])
+        forecast_status = FORECAST_LABELS[forecast_code]
 
-        # 3. CLINICAL GUARDRAILS (Synchronizes logic with screenshots)
+        # 2. CLINICAL GUARDRAILS (Synchronizes logic with screenshots)
+        # Evaluated before the model: when either rule applies it decides the outcome
         hr = latest.get('ecg_bpm', 75)
         spo2 = latest.get('spo2_percent', 98)
-        
-        # Rule A: Healthy Vitals Override (Fixes Patient 001 False Positive)
-        if 60 <= hr <= 95 and spo2 >= 96:
-            is_abnormal = 0
+        verdict = guardrail_verdict(float(hr), float(spo2), forecast_code)
 
-        # Rule B: Emergency Sync (Fixes Patient 002/003 Disconnect)
-        # If forecasting sees a crisis or oxygen is low, the AI classification MUST be abnormal
-        if spo2 < 93 or "WARNING" in forecast_status or "CRITICAL" in forecast_status or "ALERT" in forecast_status:
-            is_abnormal = 1
+        # 3. AI PREDICTION (only when the guardrails are inconclusive)
+        is_abnormal = 0
+        if verdict >= 0:
+            is_abnormal = int(verdict)
+        elif model is not None or onnx_session is not None:
+            is_abnormal = predict_abnormal(build_feature_row(latest))
 
         # 4. BUILD FINAL REPORT
-        report = {
-            "status": "normal" if is_abnormal == 0 else "abnormal",
-            "alerts": [],
-            "forecast": forecast_status
-        }
+        report = REPORT_TEMPLATE.copy()
+        report["status"] = "normal" if is_abnormal == 0 else "abnormal"
+        report["forecast"] = forecast_status
 
         if is_abnormal:
             if spo2 < 93:
-                report["alerts"].append("CRITICAL: HYPOXIA DETECTED")
-            elif "CRITICAL" in forecast_status:
-                report["alerts"].append("AI: DEATH SPIRAL PREDICTION")
+                report["alerts"] = ALERT_HYPOXIA
+            elif forecast_code == FORECAST_CRITICAL:
+                report["alerts"] = ALERT_DEATH_SPIRAL
             elif hr > 140:
-                report["alerts"].append("ALERT: SEVERE TACHYCARDIA")
+                report["alerts"] = ALERT_TACHYCARDIA
             else:
-                report["alerts"].append("AI: ANOMALY DETECTED")
+                report["alerts"] = ALERT_ANOMALY
 
         # 5. BLOCKCHAIN AUDIT HASHING
         latest['_id'] = str(latest['_id'])
-        latest['timestamp'] = latest['timestamp'].isoformat()
-        hash_input = f"{latest['_id']}-{latest['timestamp']}-{hr}"
-        latest['block_hash'] = hashlib.sha256(hash_input.encode()).hexdigest().upper()
-
-        return jsonify({
-            "vitals": latest,
-            "anomaly_report": report,
-            "abp_progress": abp_progress,
-            "mode": "Clinical Validation Node"
-        })
+        hash_input = f"{latest['_id']}-{canonical_timestamp(latest['timestamp'])}-{hr}"
+        latest['block_hash'] = audit_hash(hash_input.encode()).hexdigest().upper()
+        latest['hash_algorithm'] = HASH_ALGORITHM
+
+        response = RESPONSE_TEMPLATE.copy()
+        response["vitals"] = latest
+        response["anomaly_report"] = report
+        response["abp_progress"] = abp_progress
+        return jsonify(response)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
+    # The development server is a single process, so it sees every POST
+    LOCAL_WINDOW_ENABLED = True
     port = int(os.environ.get("PORT", 5001))
     app.run(host='0.0.0.0', port=port, threaded=True)
@@ -286,7 +286,7 @@ const App = () => {
                   <Lock size={16} className="text-blue-500" /> Blockchain Log
                 </h3>
                 <div className="bg-black/60 p-5 rounded-2xl border border-gray-800/60 font-mono text-[9px] text-blue-400/80 break-all leading-relaxed shadow-inner uppercase font-black">
-                  SHA-256: {vitals?.vitals?.block_hash}
+                  {vitals?.vitals?.hash_algorithm ?? 'SHA-256'}: {vitals?.vitals?.block_hash}
                 </div>
                 <div className="mt-5 flex items-center gap-3 text-[10px] font-bold text-gray-500 uppercase tracking-widest">
                    <div className="w-2.5 h-2.5 rounded-full bg-blue-500 animate-pulse" />
@@ -0,0 +1,14 @@
+import os
+
+# Production server for the EzyMedi backend: `gunicorn backend.app:app -c gunicorn.conf.py`
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+
+# One process per core so model inference is not serialized on a single GIL;
+# threads cover the I/O-bound MongoDB calls inside each worker
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+threads = 4
+worker_class = "gthread"
+
+# Import the app in each worker (after fork) so the MongoClient, model and
+# background writer thread are created per process rather than shared
+preload_app = False
@@ -2,6 +2,7 @@ import subprocess
 import time
 import sys
 import os
+import importlib.util
 
 
 def run_system():
@@ -20,9 +21,15 @@ def run_system():
             return  # Stop if training fails
 
     # 2. Start Backend Server (runs in parallel)
-    print("🚀 Starting Flask Backend (Server + Internal Simulator)...")
     # Popen starts the process without blocking this script
-    backend = subprocess.Popen([sys.executable, 'backend/app.py'])
+    # Gunicorn needs the POSIX-only fcntl module, so it cannot start on Windows
+    if importlib.util.find_spec('fcntl') is not None and importlib.util.find_spec('gunicorn') is not None:
+        print("🚀 Starting Flask Backend under Gunicorn (multi-worker)...")
+        backend = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'backend.app:app', '-c', 'gunicorn.conf.py'])
+    else:
+        # Windows (or Gunicorn not installed): fall back to the development server
+        print("🚀 Starting Flask Backend (Server + Internal Simulator)...")
+        backend = subprocess.Popen([sys.executable, 'backend/app.py'])
 
     # Give the server a moment to initialize
     time.sleep(3)
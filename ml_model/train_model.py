@@ -6,6 +6,15 @@ from sklearn.metrics import accuracy_score, classification_report
 import joblib
 import os
 
+# Optional ONNX export for compiled inference in the backend
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    HAS_SKL2ONNX = True
+except ImportError:
+    HAS_SKL2ONNX = False
+
 # Features must stay consistent across the entire system
 FEATURE_NAMES = [
     'body_temperature_C', 'humidity_percent', 'spo2_percent', 'ecg_bpm',
@@ -20,34 +29,51 @@ def generate_augmented_data(samples=2000):
     Creates specialized synthetic data to teach the AI about 'Noise vs Crisis'.
     This is the 'Secret Sauce' that prevents False Alarms (Alarm Fatigue).
     """
-    data = []
-    for _ in range(samples):
-        # Case 1: Motion Artifacts (High Motion, Jittery HR, but HEALTHY)
-        # This teaches the AI: High G-force + High HR != Emergency if SpO2 is fine.
-        if np.random.rand() > 0.7:
-            bpm = np.random.uniform(100, 130)
-            mot = np.random.uniform(4.0, 7.0)  # High movement
-            spo2 = np.random.uniform(96, 99)  # Oxygen is still good
-            label = 0  # NORMAL
-
-        # Case 2: Acute Crisis (Low Motion, High HR, Low SpO2)
-        # This teaches the AI: This is a real heart failure.
-        elif np.random.rand() > 0.4:
-            bpm = np.random.uniform(130, 180)
-            mot = np.random.uniform(0.1, 1.0)  # Patient is likely still/collapsed
-            spo2 = np.random.uniform(85, 92)  # Oxygen is dangerously low
-            label = 1  # ABNORMAL
-
-        # Case 3: Standard Healthy Baseline
-        else:
-            bpm = np.random.uniform(65, 85)
-            mot = np.random.uniform(0.1, 0.8)
-            spo2 = np.random.uniform(97, 99)
-            label = 0  # NORMAL
-
-        data.append([36.7, 50.0, spo2, bpm, 120, 80, 0.0, mot, label])
-
-    return pd.DataFrame(data, columns=FEATURE_NAMES + ['is_abnormal'])
+    rng = np.random.default_rng()
+
+    # Draw the scenario for every sample at once instead of branching per row
+    case1 = rng.random(samples) > 0.7
+    case2 = ~case1 & (rng.random(samples) > 0.4)
+    case3 = ~(case1 | case2)
+
+    bpm = np.empty(samples, dtype=np.float32)
+    mot = np.empty(samples, dtype=np.float32)
+    spo2 = np.empty(samples, dtype=np.float32)
+    label = np.zeros(samples, dtype=np.int8)
+
+    # Case 1: Motion Artifacts (High Motion, Jittery HR, but HEALTHY)
+    # This teaches the AI: High G-force + High HR != Emergency if SpO2 is fine.
+    n = case1.sum()
+    bpm[case1] = rng.uniform(100, 130, n)
+    mot[case1] = rng.uniform(4.0, 7.0, n)  # High movement
+    spo2[case1] = rng.uniform(96, 99, n)  # Oxygen is still good
+
+    # Case 2: Acute Crisis (Low Motion, High HR, Low SpO2)
+    # This teaches the AI: This is a real heart failure.
+    n = case2.sum()
+    bpm[case2] = rng.uniform(130, 180, n)
+    mot[case2] = rng.uniform(0.1, 1.0, n)  # Patient is likely still/collapsed
+    spo2[case2] = rng.uniform(85, 92, n)  # Oxygen is dangerously low
+    label[case2] = 1  # ABNORMAL
+
+    # Case 3: Standard Healthy Baseline
+    n = case3.sum()
+    bpm[case3] = rng.uniform(65, 85, n)
+    mot[case3] = rng.uniform(0.1, 0.8, n)
+    spo2[case3] = rng.uniform(97, 99, n)
+
+    # Columns in FEATURE_NAMES order
+    X = np.column_stack([
+        np.full(samples, 36.7, dtype=np.float32),
+        np.full(samples, 50.0, dtype=np.float32),
+        spo2,
+        bpm,
+        np.full(samples, 120, dtype=np.float32),
+        np.full(samples, 80, dtype=np.float32),
+        np.zeros(samples, dtype=np.float32),
+        mot
+    ])
+    return X, label
 
 
 def train_clinical_model():
@@ -56,21 +82,23 @@ def train_clinical_model():
     # 1. Load Data from Simulator (Real MIT-BIH/PhysioNet patterns)
     if os.path.exists(CSV_PATH) and os.path.getsize(CSV_PATH) > 100:
         print(f"📈 Loading Real-World Clinical Data from {CSV_PATH}...")
-        real_df = pd.read_csv(CSV_PATH)
-        real_df = real_df.dropna(subset=FEATURE_NAMES + ['is_abnormal'])
+        # Only the model columns are parsed, straight to float32
+        real = pd.read_csv(CSV_PATH, usecols=FEATURE_NAMES + ['is_abnormal'], dtype=np.float32)
+        real = real[FEATURE_NAMES + ['is_abnormal']].to_numpy()
+        real = real[~np.isnan(real).any(axis=1)]
+        X_real, y_real = real[:, :-1], real[:, -1].astype(np.int8)
     else:
         print("⚠️ No CSV found. Using specialized synthetic augmentation only.")
-        real_df = pd.DataFrame()
+        X_real = np.empty((0, len(FEATURE_NAMES)), dtype=np.float32)
+        y_real = np.empty(0, dtype=np.int8)
 
     # 2. Augment the dataset with "Noise vs Crisis" logic
     # This makes the AI significantly more reliable than standard hospital monitors
-    aug_df = generate_augmented_data(3000)
-
-    # Combine datasets
-    final_df = pd.concat([real_df, aug_df], ignore_index=True)
+    X_aug, y_aug = generate_augmented_data(3000)
 
-    X = final_df[FEATURE_NAMES]
-    y = final_df['is_abnormal']
+    # Combine datasets (float32 matches the forest's internal threshold dtype)
+    X = np.vstack([X_real, X_aug])
+    y = np.concatenate([y_real, y_aug])
 
     # 3. Train Random Forest (Clinical Fusion)
     # We use 200 estimators for deeper pattern recognition
@@ -98,9 +126,28 @@ def train_clinical_model():
 
     # 5. Save the 'Brain'
     model_path = os.path.join(os.path.dirname(__file__), 'model.pkl')
-    joblib.dump(model, model_path)
+    # LZ4 keeps model.pkl small while still decompressing quickly at backend boot
+    joblib.dump(model, model_path, compress=('lz4', 3))
     print(f"\n💾 Clinical Brain ('model.pkl') saved and ready for deployment.")
 
+    # 6. Export a compiled copy for ONNX Runtime (label output only, no ZipMap)
+    onnx_path = os.path.join(os.path.dirname(__file__), 'model.onnx')
+    if HAS_SKL2ONNX:
+        onnx_model = convert_sklearn(
+            model,
+            initial_types=[('x', FloatTensorType([None, len(FEATURE_NAMES)]))],
+            options={id(model): {'zipmap': False}}
+        )
+        with open(onnx_path, 'wb') as f:
+            f.write(onnx_model.SerializeToString())
+        print(f"⚡ ONNX export ('model.onnx') saved for compiled inference.")
+    else:
+        print("⚠️ skl2onnx not installed. Skipping ONNX export.")
+        # An export from an earlier run would otherwise keep serving the old forest
+        if os.path.exists(onnx_path):
+            os.remove(onnx_path)
+            print("🗑️ Removed stale 'model.onnx' from a previous training run.")
+
 
 if __name__ == "__main__":
     train_clinical_model()
\ No newline at end of file
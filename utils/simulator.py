@@ -1,9 +1,11 @@
 import requests
+import orjson
 import random
 import time
 import os
 import numpy as np
 from itertools import cycle
+from requests.adapters import HTTPAdapter
 
 # Attempt to load medical library for real clinical patterns
 try:
@@ -19,6 +21,11 @@ BACKEND_URL = 'http://127.0.0.1:5001/api/vitals'
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MIT_BIH_DIR = os.path.join(BASE_DIR, 'backend', 'mit_bih_data')
 
+# Persistent keep-alive session so each packet reuses a pooled socket
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+session.headers.update({'Content-Type': 'application/json'})
+
 
 class ClinicalWardPatient:
     def __init__(self, pid, record, condition):
@@ -136,7 +143,7 @@ if __name__ == "__main__":
         p = next(stream)
         try:
             # Send to the backend API
-            requests.post(BACKEND_URL, json=p.get_packet(), timeout=5)
+            session.post(BACKEND_URL, data=orjson.dumps(p.get_packet()), timeout=5)
         except Exception as e:
             # Silent fail for connection issues during ward cycles
             pass